@@ -4,13 +4,106 @@
 提供图形界面用于输入矩形坐标并绘图
 """
 
+import os
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+import matplotlib.image as mpimg
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
 
+from rectangle_plotter import RectanglePlotter
+
+
+# 导出图片的默认分辨率
+EXPORT_DPI = 300
+# 导出分辨率选项，"屏幕分辨率"直接复用画布已渲染的缓冲区
+SCREEN_DPI_CHOICE = "屏幕分辨率"
+EXPORT_DPI_CHOICES = (SCREEN_DPI_CHOICE, "150", "300", "600")
+# 可以直接写出Agg缓冲区的位图格式
+RASTER_FORMATS = ('.png', '.jpg', '.jpeg')
+# 后台导出进度的轮询间隔（毫秒）
+EXPORT_POLL_MS = 100
+
+
+def crop_to_tight_bbox(fig, renderer):
+    """
+    将已渲染的Agg缓冲区裁剪到紧凑边界，与 savefig(bbox_inches='tight') 的取景一致
+
+    参数:
+    fig: 已绘制的matplotlib Figure
+    renderer: 该图形的Agg渲染器
+
+    返回:
+    裁剪后的RGBA像素数组（副本）。超出画布的部分会被截掉，不会补白
+    """
+    bbox = fig.get_tightbbox(renderer).padded(plt.rcParams['savefig.pad_inches'])
+    buffer = np.asarray(renderer.buffer_rgba())
+    height, width = buffer.shape[:2]
+
+    # 缓冲区第0行是图形顶部
+    left = max(int(np.floor(bbox.x0 * fig.dpi)), 0)
+    right = min(int(np.ceil(bbox.x1 * fig.dpi)), width)
+    top = max(int(np.floor(height - bbox.y1 * fig.dpi)), 0)
+    bottom = min(int(np.ceil(height - bbox.y0 * fig.dpi)), height)
+    return np.array(buffer[top:bottom, left:right])
+
+
+def render_scene_to_file(file_path, plotter, options, figsize, dpi, report):
+    """
+    使用独立的Agg图形渲染场景并保存（可在后台线程中调用）
+
+    位图格式只渲染一次，然后裁剪到紧凑边界写出；其他格式按紧凑边界调用 savefig。
+
+    参数:
+    file_path: 保存路径
+    plotter: RectanglePlotter 快照
+    options: 绘图选项，见 RectanglePlotter.render
+    figsize: 图形尺寸（英寸）
+    dpi: 导出分辨率
+    report: 进度回调，接收一条进度文本
+    """
+    # 不经过pyplot，避免与Tk线程共享全局状态
+    fig = Figure(figsize=figsize, dpi=dpi)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+
+    report(f"正在绘制 {len(plotter.rectangles)} 个矩形...")
+    plotter.render(ax, options)
+
+    if os.path.splitext(file_path)[1].lower() in RASTER_FORMATS:
+        report(f"正在以 {dpi} dpi 渲染...")
+        canvas.draw()
+
+        report("正在计算紧凑边界...")
+        buffer = crop_to_tight_bbox(fig, canvas.get_renderer())
+        write_buffer_to_file(file_path, buffer, dpi, report)
+    else:
+        report("正在计算紧凑边界...")
+        bbox = fig.get_tightbbox(canvas.get_renderer()).padded(plt.rcParams['savefig.pad_inches'])
+
+        report("正在写入文件...")
+        fig.savefig(file_path, dpi=dpi, bbox_inches=bbox)
+
+
+def write_buffer_to_file(file_path, buffer, dpi, report):
+    """
+    将已渲染的RGBA缓冲区直接写入文件（可在后台线程中调用）
+
+    参数:
+    file_path: 保存路径
+    buffer: 已裁剪到紧凑边界的RGBA像素数组，见 crop_to_tight_bbox
+    dpi: 写入文件的分辨率信息
+    report: 进度回调，接收一条进度文本
+    """
+    report("正在写入文件...")
+    mpimg.imsave(file_path, buffer, dpi=dpi)
+
 
 class RectanglePlotterGUI:
     def __init__(self, root):
@@ -18,9 +111,19 @@ class RectanglePlotterGUI:
         self.root.title("Rectangle Plotter")
         self.root.geometry("1200x800")
 
-        # 矩形数据存储
-        self.rectangles = []
-        self.rectangles_data = []
+        # 矩形数据模型，数据变化时刷新列表和画布
+        self.plotter = RectanglePlotter()
+        self.plotter.add_listener(self.on_plotter_changed)
+        self.redraw_pending = None
+
+        # 默认标签编号只增不减，删除矩形后不会产生重复标签
+        self.box_count = 0
+
+        # 后台导出状态
+        self.export_thread = None
+        self.export_queue = queue.Queue()
+        self.export_started = None
+        self.export_stage = ""
 
         # 创建界面
         self.create_widgets()
@@ -105,20 +208,35 @@ class RectanglePlotterGUI:
         options_frame.pack(fill=tk.X, pady=(0, 10))
 
         self.show_centers_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(options_frame, text="显示中心点", variable=self.show_centers_var).pack(anchor=tk.W)
+        ttk.Checkbutton(options_frame, text="显示中心点", variable=self.show_centers_var, command=self.request_redraw).pack(anchor=tk.W)
 
         self.show_grid_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(options_frame, text="显示网格", variable=self.show_grid_var).pack(anchor=tk.W)
+        ttk.Checkbutton(options_frame, text="显示网格", variable=self.show_grid_var, command=self.request_redraw).pack(anchor=tk.W)
 
         self.equal_aspect_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(options_frame, text="等比例坐标", variable=self.equal_aspect_var).pack(anchor=tk.W)
+        ttk.Checkbutton(options_frame, text="等比例坐标", variable=self.equal_aspect_var, command=self.request_redraw).pack(anchor=tk.W)
 
         # 操作按钮
         action_frame = ttk.Frame(control_frame)
         action_frame.pack(fill=tk.X)
 
         ttk.Button(action_frame, text="绘制图形", command=self.plot_rectangles, style="Accent.TButton").pack(fill=tk.X, pady=(0, 5))
-        ttk.Button(action_frame, text="保存图片", command=self.save_plot).pack(fill=tk.X)
+        # 保存按钮和导出分辨率
+        save_frame = ttk.Frame(action_frame)
+        save_frame.pack(fill=tk.X)
+
+        self.save_button = ttk.Button(save_frame, text="保存图片", command=self.save_plot)
+        self.save_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
+
+        ttk.Label(save_frame, text="DPI:").pack(side=tk.LEFT, padx=(0, 5))
+        self.export_dpi_var = tk.StringVar(value=str(EXPORT_DPI))
+        dpi_combo = ttk.Combobox(save_frame, textvariable=self.export_dpi_var, width=10, state="readonly")
+        dpi_combo['values'] = EXPORT_DPI_CHOICES
+        dpi_combo.pack(side=tk.LEFT)
+
+        # 导出状态
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(action_frame, textvariable=self.status_var, font=('Arial', 8), foreground='gray').pack(anchor=tk.W, pady=(5, 0))
 
         # 右侧绘图区域
         plot_frame = ttk.LabelFrame(main_frame, text="绘图区域", padding="10")
@@ -130,19 +248,49 @@ class RectanglePlotterGUI:
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
         # 初始化空图
-        self.setup_empty_plot()
-
-    def setup_empty_plot(self):
-        """设置空白的初始图形"""
-        self.ax.clear()
-        self.ax.set_xlabel('Left - Right Coordinates')
-        self.ax.set_ylabel('Back - Front Coordinates')
-        self.ax.set_title('Rectangle Plotter')
-        self.ax.grid(True, linestyle='--', alpha=0.6)
-        self.ax.axhline(y=0, color='k', linestyle='-', alpha=0.3, linewidth=0.5)
-        self.ax.axvline(x=0, color='k', linestyle='-', alpha=0.3, linewidth=0.5)
-        self.ax.set_xlim(-10, 10)
-        self.ax.set_ylim(-10, 10)
+        self.redraw()
+
+    def render_options(self):
+        """获取当前界面上的绘图选项"""
+        return {
+            'show_centers': self.show_centers_var.get(),
+            'show_grid': self.show_grid_var.get(),
+            'equal_aspect': self.equal_aspect_var.get(),
+            'title': 'Rectangle Plotter'
+        }
+
+    def on_plotter_changed(self, event, index):
+        """数据模型变化回调：同步矩形列表并安排重绘"""
+        if event == 'add':
+            rect_data = self.plotter.rectangles_data[index]
+            self.tree.insert('', index, values=(
+                f"{rect_data['x1']:.2f}",
+                f"{rect_data['x2']:.2f}",
+                f"{rect_data['y1']:.2f}",
+                f"{rect_data['y2']:.2f}",
+                rect_data['color'],
+                rect_data['label']
+            ))
+        elif event == 'remove':
+            children = self.tree.get_children()
+            self.tree.delete(*(children[i] for i in index))
+        elif event == 'clear':
+            self.tree.delete(*self.tree.get_children())
+
+        self.request_redraw()
+
+    def request_redraw(self):
+        """安排一次重绘，连续多次变化只重绘一次"""
+        if self.redraw_pending is None:
+            self.redraw_pending = self.root.after_idle(self.redraw)
+
+    def redraw(self):
+        """使用当前数据和选项重绘画布"""
+        if self.redraw_pending is not None:
+            self.root.after_cancel(self.redraw_pending)
+            self.redraw_pending = None
+
+        self.plotter.render(self.ax, self.render_options())
         self.canvas.draw()
 
     def add_rectangle(self):
@@ -170,28 +318,11 @@ class RectanglePlotterGUI:
             back = float(parts[2])
             front = float(parts[3])
             color = self.color_var.get()
-            label = self.label_var.get() or f"Box {len(self.rectangles) + 1}"
-
-            # 添加到数据列表
-            rect_data = {
-                'left': left,
-                'right': right,
-                'back': back,
-                'front': front,
-                'color': color,
-                'label': label
-            }
-            self.rectangles_data.append(rect_data)
-
-            # 添加到树形列表
-            self.tree.insert('', 'end', values=(
-                f"{left:.2f}",
-                f"{right:.2f}",
-                f"{back:.2f}",
-                f"{front:.2f}",
-                color,
-                label
-            ))
+            self.box_count += 1
+            label = self.label_var.get() or f"Box {self.box_count}"
+
+            # 添加到数据模型（列表和画布由变化回调刷新）
+            self.plotter.add_rectangle(left, right, back, front, color=color, label=label)
 
             # 清空坐标输入框和标签（保留颜色）
             self.coords_var.set("0.0 5.0 0.0 5.0")
@@ -211,113 +342,53 @@ class RectanglePlotterGUI:
             messagebox.showwarning("警告", "请先选择要删除的矩形！")
             return
 
-        # 删除选中的项目
-        for item in selected_items:
-            # 获取选中项的索引
-            index = self.tree.index(item)
-            # 从数据列表中删除
-            if 0 <= index < len(self.rectangles_data):
-                del self.rectangles_data[index]
-            # 从树形列表中删除
-            self.tree.delete(item)
+        # 一次性删除所有选中项（列表和画布由变化回调刷新）
+        positions = {item: i for i, item in enumerate(self.tree.get_children())}
+        self.plotter.remove_rectangles([positions[item] for item in selected_items])
 
         messagebox.showinfo("成功", "选中的矩形已删除！")
 
     def clear_all(self):
         """清除所有矩形"""
-        if not self.rectangles_data:
+        if not self.plotter.rectangles:
             messagebox.showinfo("提示", "没有矩形需要清除！")
             return
 
         if messagebox.askyesno("确认", "确定要清除所有矩形吗？"):
-            self.rectangles_data.clear()
-            for item in self.tree.get_children():
-                self.tree.delete(item)
-            self.setup_empty_plot()
+            self.plotter.clear()
+            self.box_count = 0
             messagebox.showinfo("成功", "所有矩形已清除！")
 
     def plot_rectangles(self):
         """绘制所有矩形"""
-        if not self.rectangles_data:
+        if not self.plotter.rectangles:
             messagebox.showwarning("警告", "没有矩形可绘制！")
             return
 
-        # 清除当前图形
-        self.ax.clear()
-
-        # 绘制每个矩形
-        for i, rect_data in enumerate(self.rectangles_data):
-            left = rect_data['left']
-            right = rect_data['right']
-            back = rect_data['back']
-            front = rect_data['front']
-            color = rect_data['color']
-            label = rect_data['label']
-
-            # 确保坐标顺序正确
-            x_min, x_max = min(left, right), max(left, right)
-            y_min, y_max = min(back, front), max(back, front)
-
-            # 绘制矩形
-            width = x_max - x_min
-            height = y_max - y_min
-            rect = patches.Rectangle((x_min, y_min), width, height,
-                                   linewidth=2, edgecolor=color, facecolor='none',
-                                   label=label)
-            self.ax.add_patch(rect)
-
-            # 添加中心点
-            if self.show_centers_var.get():
-                x_center = x_min + width / 2
-                y_center = y_min + height / 2
-                self.ax.plot(x_center, y_center, color=color, marker='+', markersize=10)
-
-        # 设置坐标轴范围
-        if self.rectangles_data:
-            all_x = []
-            all_y = []
-            for rect_data in self.rectangles_data:
-                all_x.extend([rect_data['left'], rect_data['right']])
-                all_y.extend([rect_data['back'], rect_data['front']])
-
-            x_min, x_max = min(all_x), max(all_x)
-            y_min, y_max = min(all_y), max(all_y)
-
-            # 添加边距
-            x_pad = (x_max - x_min) * 0.1 if x_max != x_min else 1
-            y_pad = (y_max - y_min) * 0.1 if y_max != y_min else 1
-
-            self.ax.set_xlim(x_min - x_pad, x_max + x_pad)
-            self.ax.set_ylim(y_min - y_pad, y_max + y_pad)
-
-        # 设置图形属性
-        self.ax.set_xlabel('Left - Right Coordinates')
-        self.ax.set_ylabel('Back - Front Coordinates')
-        self.ax.set_title('Rectangle Plotter')
-
-        if self.show_grid_var.get():
-            self.ax.grid(True, linestyle='--', alpha=0.6)
-
-        if self.equal_aspect_var.get():
-            self.ax.set_aspect('equal', adjustable='box')
-
-        # 添加坐标轴
-        self.ax.axhline(y=0, color='k', linestyle='-', alpha=0.3, linewidth=0.5)
-        self.ax.axvline(x=0, color='k', linestyle='-', alpha=0.3, linewidth=0.5)
-
-        # 添加图例
-        if self.rectangles_data:
-            self.ax.legend()
-
-        # 刷新画布
-        self.canvas.draw()
+        self.redraw()
+
+    def export_dpi(self):
+        """获取界面上选择的导出分辨率"""
+        choice = self.export_dpi_var.get()
+        if choice == SCREEN_DPI_CHOICE:
+            return self.fig.dpi
+        return int(choice)
+
+    def save_plot(self, dpi=None):
+        """
+        保存图片（在后台线程中渲染，不阻塞界面）
 
-    def save_plot(self):
-        """保存图片"""
-        if not self.rectangles_data:
+        参数:
+        dpi: 导出分辨率，为None时使用界面上选择的分辨率
+        """
+        if not self.plotter.rectangles:
             messagebox.showwarning("警告", "没有图形可保存！")
             return
 
+        if self.export_thread is not None:
+            messagebox.showwarning("警告", "正在保存图片，请稍候！")
+            return
+
         # 选择保存路径
         file_path = filedialog.asksaveasfilename(
             initialdir="out",  # 默认打开out目录
@@ -330,16 +401,74 @@ class RectanglePlotterGUI:
             ]
         )
 
-        if file_path:
-            try:
-                # 确保目录存在
-                import os
-                os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        if not file_path:
+            return
+
+        # 保存的是画布上显示的图形，先完成尚未执行的重绘
+        if self.redraw_pending is not None:
+            self.redraw()
+
+        if dpi is None:
+            dpi = self.export_dpi()
+
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in RASTER_FORMATS and dpi == self.fig.dpi:
+            # 分辨率与画布一致，直接复用已渲染的Agg缓冲区
+            buffer = crop_to_tight_bbox(self.fig, self.canvas.get_renderer())
+            job, args = write_buffer_to_file, (buffer, dpi)
+        else:
+            job, args = render_scene_to_file, (self.plotter.snapshot(), self.render_options(),
+                                               tuple(self.fig.get_size_inches()), dpi)
+
+        self.save_button.state(['disabled'])
+        self.export_started = time.monotonic()
+        self.export_stage = "正在保存图片..."
+        self.status_var.set(self.export_stage)
+        self.export_thread = threading.Thread(target=self.run_export,
+                                              args=(job, file_path) + args,
+                                              daemon=True)
+        self.export_thread.start()
+        self.root.after(EXPORT_POLL_MS, self.poll_export)
+
+    def run_export(self, job, file_path, *args):
+        """后台线程：执行导出任务，结果通过队列返回给Tk线程"""
+        def report(message):
+            self.export_queue.put(('progress', message))
+
+        try:
+            # 确保目录存在
+            directory = os.path.dirname(file_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            job(file_path, *args, report)
+            self.export_queue.put(('done', file_path))
+        except Exception as e:
+            self.export_queue.put(('error', str(e)))
+
+    def poll_export(self):
+        """在Tk线程中处理后台导出的进度和结果"""
+        try:
+            while True:
+                kind, payload = self.export_queue.get_nowait()
+                if kind == 'progress':
+                    self.export_stage = payload
+                    continue
+
+                self.export_thread = None
+                self.save_button.state(['!disabled'])
+                self.status_var.set("")
+                if kind == 'done':
+                    messagebox.showinfo("成功", f"图片已保存到: {payload}")
+                else:
+                    messagebox.showerror("错误", f"保存图片失败: {payload}")
+                return
+        except queue.Empty:
+            pass
 
-                self.fig.savefig(file_path, dpi=300, bbox_inches='tight')
-                messagebox.showinfo("成功", f"图片已保存到: {file_path}")
-            except Exception as e:
-                messagebox.showerror("错误", f"保存图片失败: {str(e)}")
+        elapsed = time.monotonic() - self.export_started
+        self.status_var.set(f"{self.export_stage}（已用时 {elapsed:.1f} 秒）")
+        self.root.after(EXPORT_POLL_MS, self.poll_export)
 
 
 def main():
@@ -12,11 +12,40 @@ import os
 from datetime import datetime
 
 
+# render() 的默认绘图选项
+DEFAULT_RENDER_OPTIONS = {
+    'show_grid': True,
+    'show_axes': True,
+    'equal_aspect': True,
+    'title': "矩形绘图",
+    'show_centers': True,
+    'xlabel': 'Left - Right Coordinates',
+    'ylabel': 'Back - Front Coordinates',
+}
+
+
 class RectanglePlotter:
     def __init__(self):
         self.rectangles = []
         self.rectangles_data = []  # 存储原始数据用于标签
         self.colors = []
+        self.listeners = []  # 数据变化时的回调函数
+
+    def add_listener(self, callback):
+        """
+        注册数据变化回调
+
+        参数:
+        callback: 回调函数 callback(event, index)，event 为 'add'、'remove' 或 'clear'；
+                  'add' 时 index 为新矩形的下标，'remove' 时为被删除下标的升序列表，
+                  'clear' 时为None
+        """
+        self.listeners.append(callback)
+
+    def _notify(self, event, index=None):
+        """通知所有回调数据已变化"""
+        for callback in list(self.listeners):
+            callback(event, index)
 
     def add_rectangle(self, x1, x2, y1, y2, color='blue', alpha=0.5, label=None, facecolor='none'):
         """
@@ -40,6 +69,48 @@ class RectanglePlotter:
             'color': color, 'alpha': alpha, 'label': label, 'facecolor': facecolor
         })
         self.colors.append((color, alpha, facecolor))
+        self._notify('add', len(self.rectangles) - 1)
+
+    def remove_rectangle(self, index):
+        """
+        删除指定下标的矩形
+
+        参数:
+        index: 矩形下标
+        """
+        self.remove_rectangles([index])
+
+    def remove_rectangles(self, indices):
+        """
+        批量删除矩形，只发送一次变化通知
+
+        参数:
+        indices: 矩形下标列表，支持负数下标
+        """
+        count = len(self.rectangles)
+        for index in indices:
+            if not -count <= index < count:
+                raise IndexError(f"矩形下标越界: {index}")
+
+        removed = sorted({index % count for index in indices})
+        if not removed:
+            return
+
+        keep = set(range(len(self.rectangles))).difference(removed)
+        self.rectangles = [item for i, item in enumerate(self.rectangles) if i in keep]
+        self.rectangles_data = [item for i, item in enumerate(self.rectangles_data) if i in keep]
+        self.colors = [item for i, item in enumerate(self.colors) if i in keep]
+        self._notify('remove', removed)
+
+    def snapshot(self):
+        """
+        复制当前矩形数据，返回一个不带回调的新绘图器（可交给后台线程渲染）
+        """
+        plotter = RectanglePlotter()
+        plotter.rectangles = list(self.rectangles)
+        plotter.rectangles_data = [dict(rect_data) for rect_data in self.rectangles_data]
+        plotter.colors = list(self.colors)
+        return plotter
 
     def add_rectangles_from_list(self, rect_list, colors=None, labels=None):
         """
@@ -70,11 +141,13 @@ class RectanglePlotter:
             x1, x2, y1, y2 = rect
             self.add_rectangle(x1, x2, y1, y2, color=color, label=label)
 
-    def plot(self, show_grid=True, show_axes=True, equal_aspect=True, title="矩形绘图",
-            show_centers=True, save_path=None, xlabel='Left - Right Coordinates', ylabel='Back - Front Coordinates', auto_save=False):
+    def plot(self, show_grid=None, show_axes=None, equal_aspect=None, title=None,
+            show_centers=None, save_path=None, xlabel=None, ylabel=None, auto_save=False):
         """
         绘制所有矩形
 
+        绘图选项为None时使用 DEFAULT_RENDER_OPTIONS 中的值
+
         参数:
         show_grid: 是否显示网格
         show_axes: 是否显示坐标轴
@@ -92,6 +165,52 @@ class RectanglePlotter:
 
         fig, ax = plt.subplots(figsize=(10, 8))
 
+        options = {
+            'show_grid': show_grid,
+            'show_axes': show_axes,
+            'equal_aspect': equal_aspect,
+            'title': title,
+            'show_centers': show_centers,
+            'xlabel': xlabel,
+            'ylabel': ylabel,
+        }
+        self.render(ax, {key: value for key, value in options.items() if value is not None})
+
+        plt.tight_layout()
+
+        # 保存图片
+        if save_path:
+            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            print(f"图片已保存到: {save_path}")
+        elif auto_save:
+            # 自动保存到out目录
+            os.makedirs('out', exist_ok=True)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            default_save_path = f'out/rectangles_{timestamp}.png'
+            plt.savefig(default_save_path, dpi=300, bbox_inches='tight')
+            print(f"图片已自动保存到: {default_save_path}")
+
+        plt.show()
+
+    def render(self, ax, options=None):
+        """
+        在给定的Axes上绘制所有矩形（会先清除Axes）
+
+        参数:
+        ax: matplotlib Axes，可以是plt创建的，也可以是嵌入GUI的
+        options: 绘图选项字典，未给出的键使用 DEFAULT_RENDER_OPTIONS 中的值
+                 show_grid: 是否显示网格
+                 show_axes: 是否显示过原点的坐标轴线
+                 equal_aspect: 是否使用等比例坐标轴
+                 title: 图表标题
+                 show_centers: 是否显示中心点标记
+                 xlabel: x轴标签
+                 ylabel: y轴标签
+        """
+        options = {**DEFAULT_RENDER_OPTIONS, **(options or {})}
+
+        ax.clear()
+
         # 绘制矩形
         for i, (rect_coords, rect_data, (color, alpha, facecolor)) in enumerate(
             zip(self.rectangles, self.rectangles_data, self.colors)):
@@ -102,64 +221,59 @@ class RectanglePlotter:
             ax.add_patch(rect)
 
             # 添加中心点标记
-            if show_centers:
+            if options['show_centers']:
                 x_center = rect_coords[0] + rect_coords[2] / 2
                 y_center = rect_coords[1] + rect_coords[3] / 2
                 ax.plot(x_center, y_center, color=color, marker='+', markersize=10)
 
         # 设置坐标轴范围
-        all_x = []
-        all_y = []
-        for rect_data in self.rectangles_data:
-            all_x.extend([rect_data['x1'], rect_data['x2']])
-            all_y.extend([rect_data['y1'], rect_data['y2']])
-
-        x_min, x_max = min(all_x), max(all_x)
-        y_min, y_max = min(all_y), max(all_y)
-
-        # 添加一些边距
-        x_pad = (x_max - x_min) * 0.1 if x_max != x_min else 1
-        y_pad = (y_max - y_min) * 0.1 if y_max != y_min else 1
-
-        ax.set_xlim(x_min - x_pad, x_max + x_pad)
-        ax.set_ylim(y_min - y_pad, y_max + y_pad)
+        if self.rectangles_data:
+            all_x = []
+            all_y = []
+            for rect_data in self.rectangles_data:
+                all_x.extend([rect_data['x1'], rect_data['x2']])
+                all_y.extend([rect_data['y1'], rect_data['y2']])
+
+            x_min, x_max = min(all_x), max(all_x)
+            y_min, y_max = min(all_y), max(all_y)
+
+            # 添加一些边距
+            x_pad = (x_max - x_min) * 0.1 if x_max != x_min else 1
+            y_pad = (y_max - y_min) * 0.1 if y_max != y_min else 1
+
+            ax.set_xlim(x_min - x_pad, x_max + x_pad)
+            ax.set_ylim(y_min - y_pad, y_max + y_pad)
+        else:
+            # 没有矩形时显示默认范围
+            ax.set_xlim(-10, 10)
+            ax.set_ylim(-10, 10)
 
         # 设置图表属性
-        ax.set_xlabel(xlabel)
-        ax.set_ylabel(ylabel)
-        ax.set_title(title)
+        ax.set_xlabel(options['xlabel'])
+        ax.set_ylabel(options['ylabel'])
+        ax.set_title(options['title'])
 
-        if show_grid:
+        if options['show_grid']:
             ax.grid(True, linestyle='--', alpha=0.6)
 
-        if equal_aspect:
+        if options['equal_aspect']:
             ax.set_aspect('equal', adjustable='box')
 
+        # 添加过原点的坐标轴线
+        if options['show_axes']:
+            ax.axhline(y=0, color='k', linestyle='-', alpha=0.3, linewidth=0.5)
+            ax.axvline(x=0, color='k', linestyle='-', alpha=0.3, linewidth=0.5)
+
         # 添加图例
         if self.rectangles_data:
             ax.legend()
 
-        plt.tight_layout()
-
-        # 保存图片
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-            print(f"图片已保存到: {save_path}")
-        elif auto_save:
-            # 自动保存到out目录
-            os.makedirs('out', exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            default_save_path = f'out/rectangles_{timestamp}.png'
-            plt.savefig(default_save_path, dpi=300, bbox_inches='tight')
-            print(f"图片已自动保存到: {default_save_path}")
-
-        plt.show()
-
     def clear(self):
         """清除所有矩形"""
         self.rectangles = []
         self.rectangles_data = []
         self.colors = []
+        self._notify('clear')
 
 
 def main():